@@ -0,0 +1,16 @@
+# CYDr Frozen Module Manifest
+# Tags: Micropython Cheap Yellow Device DIYmall ESP32-2432S028R
+# License: MIT
+# https://github.com/jtobinart/MicroPython_CYD_ESP32-2432S028R
+#
+# Freezes cydr and rdagger's ili9341/xpt2046 drivers into the firmware as bytecode.
+# Build from micropython/ports/esp32:
+#   make BOARD=ESP32_GENERIC FROZEN_MANIFEST=/path/to/this/repo/boards/CYD/manifest.py
+# Paths below are relative to this file.
+
+# Keep the port's default frozen modules (asyncio, etc.)
+include("$(PORT_DIR)/boards/manifest.py")
+
+module("cydr.py", base_path="../..")
+module("ili9341.py", base_path="../../resources")
+module("xpt2046.py", base_path="../../resources")
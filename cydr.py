@@ -53,7 +53,7 @@ v1.0
 
 TO DO:
     - Implement continuous touch
-    - Implement DAC pin 26 for the speaker instead of using PWM
+    - Play DAC speaker tones without blocking
     - SD card creates a critical error when using keyboard interrupt
     - Implement easy Bluetooth functions
 '''
@@ -103,11 +103,77 @@ Pins
 ######################################################
 from ili9341 import Display, color565
 from xpt2046 import Touch
-from machine import Pin, SPI, ADC, PWM, SDCard, SoftSPI
+from machine import Pin, SPI, ADC, PWM, SoftSPI, Timer, mem32
+from array import array
+from framebuf import FrameBuffer, RGB565
+import micropython
 import network
-import os
 import time
 
+######################################################
+#   ESP32 Registers
+######################################################
+_GPIO_FUNC0_OUT_SEL_CFG = 0x3FF44530    # GPIO matrix output signal select (+4 per GPIO)
+_LEDC_BASE = 0x3FF59000                 # LEDC_HSCH0_CONF0_REG (+0x14 per high-speed channel)
+_LEDC_HSTIMER0_CONF = 0x3FF59140        # LEDC_HSTIMER0_CONF_REG (+0x8 per high-speed timer)
+_LEDC_HS_SIG_OUT0 = 71                  # GPIO matrix signal of LEDC high-speed channel 0
+_LEDC_CONF1_START = (1 << 31) | (1 << 30) | (1 << 20) | (1 << 10)    # DUTY_START, DUTY_INC, DUTY_NUM=1, DUTY_CYCLE=1
+
+_LDR_SCALE = 1.0 / 65535                # light() scale; const() only accepts ints
+
+def _ledc_hs_channel(gpio):
+    '''
+    Returns the LEDC high-speed channel routed to a GPIO, or -1 if there isn't one.
+    '''
+    sig = mem32[_GPIO_FUNC0_OUT_SEL_CFG + 4 * gpio] & 0x1FF
+    if _LEDC_HS_SIG_OUT0 <= sig < _LEDC_HS_SIG_OUT0 + 8:
+        return sig - _LEDC_HS_SIG_OUT0
+    return -1
+
+def _swap16(color):
+    '''
+    Byte-swaps an RGB565 color; FrameBuffer stores pixels little-endian but the ILI9341 expects big-endian.
+    '''
+    return ((color & 0xFF) << 8) | (color >> 8)
+
+@micropython.viper
+def _clamp10(v: int) -> int:
+    '''
+    Clamps v to the 10-bit PWM duty range (0 - 1023).
+    '''
+    if v < 0:
+        return 0
+    if v > 1023:
+        return 1023
+    return v
+
+@micropython.viper
+def _clamp8(v: int) -> int:
+    '''
+    Clamps v to the 8-bit color range (0 - 255).
+    '''
+    if v < 0:
+        return 0
+    if v > 255:
+        return 255
+    return v
+
+class _SDSession(object):
+    '''
+    Context manager returned by CYD.sd_session().
+    '''
+    def __init__(self, cyd):
+        self._cyd = cyd
+
+    def __enter__(self):
+        self._cyd.mount_sd()
+        return self._cyd
+
+    def __exit__(self, exc_type, exc, tb):
+        self._cyd.unmount_sd()
+        self._cyd.release_sd()
+        return False
+
 class CYD(object):
     ######################################################
     #   Color Variables
@@ -120,30 +186,65 @@ class CYD(object):
     PURPLE = color565(255,   0, 255)
     WHITE  = color565(255, 255, 255)
 
+    # The same colors as big-endian bytes, ready to send to the display (see fill_rect_raw())
+    BLACK_B  = b'\x00\x00'
+    RED_B    = b'\xF8\x00'
+    GREEN_B  = b'\x07\xE0'
+    CYAN_B   = b'\x07\xFF'
+    BLUE_B   = b'\x00\x1F'
+    PURPLE_B = b'\xF8\x1F'
+    WHITE_B  = b'\xFF\xFF'
+
+    ######################################################
+    #   Display Variables
+    ######################################################
+    MIN_SPI_CHUNK = 64      # Smallest pixel buffer (in bytes) worth sending in one SPI transfer
+
     ######################################################
     #   Function List
     ######################################################
     '''
-        cyd = CYD(rgb_pmw=False, speaker_gain=512, display_width=240, display_height=320, wifi_ssid = None, wifi_password = None) # Initialize CYD class
+        cyd = CYD(rgb_pmw=False, speaker_gain=512, display_width=240, display_height=320, wifi_ssid = None, wifi_password = None, hard_irq = False, hw_touch_spi = False, spi_hz = 40_000_000, speaker_dac = False, sd_enabled = False, sd_freq = None, sd_detect = False, tone_timer = 3) # Initialize CYD class
         cyd.display.ili9341_function_name()             # Use to access ili9341 functions.
+        cyd.W, cyd.H                                    # Display width and height.
+        cyd.display_spi                                 # The display's SPI bus.
+        cyd.blit(x, y, w, h, buf)                       # Writes RGB565 pixel data to a display region.
+        cyd.fill_rect_raw(x, y, w, h, color_bytes)      # Draws a filled rectangle from a pre-packed color (e.g. cyd.RED_B).
+        cyd.fb_init(y=0, h=40)                          # Creates a back-buffer for a band of display rows.
+        cyd.fb_fill(color)                              # Draws into the back-buffer. Also: fb_pixel, fb_hline, fb_vline,
+                                                        #   fb_line, fb_rect, fb_fill_rect, fb_text.
+        cyd.flush(y0=None, y1=None)                     # Pushes the back-buffer to the display.
         cyd._touch_handler(x, y)                        # Called when a touch occurs. (INTERNAL USE ONLY)
-        cyd.touches()                                   # GETS the last touch coordinates.
+        cyd.touches()                                   # GETS the last touch coordinates. (shared list)
+        await cyd.wait_touch()                          # Waits for a touch and GETS its coordinates. (asyncio)
+        cyd.touch_raw()                                 # GETS the current touch coordinates (or None) straight from the controller.
+        cyd.touch_x()                                   # GETS the last touch x coordinate.
+        cyd.touch_y()                                   # GETS the last touch y coordinate.
+        cyd.touch_into(buf)                             # GETS the last touch coordinates into buf.
+        cyd.poll_touch(callback=None)                   # GETS a new touch (or None) from the main loop.
         cyd.double_tap(x, y, error_margin = 5)          # Check for double taps.
         cyd.rgb(color)                                          # SETS rgb LED color.
+        cyd.rgb_fast(r, g, b)                                   # SETS rgb LED color using direct register writes.
         cyd._remap(value, in_min, in_max, out_min, out_max)     # Converts a value form one scale to another. (INTERNAL USE ONLY)
         cyd.light()                                             # GETS the current light sensor value.
+        cyd.light_raw()                                         # GETS the current light sensor value as 0 - 65535.
+        cyd.light8()                                            # GETS the current light sensor value as 0 - 255.
         cyd.button_boot()                               # GETS the current boot button value.
         cyd.backlight(value)                            # SETS backlight brightness.
-        cyd.play_tone(freq, duration, gain=0)           # Plays a tone for a given duration.
+        cyd.play_tone(freq, duration, gain=0)           # Plays a tone for a given duration without blocking.
+        cyd.play_tone_blocking(freq, duration, gain=0)  # Plays a tone and waits for it to finish.
         cyd.mount_sd()                                  # Mounts SD card
         cyd.unmount_sd()                                # Unmounts SD card.
+        cyd.release_sd()                                # Releases the SD card's SPI bus.
+        with cyd.sd_session(): ...                      # Mounts the SD card for a with block.
+        cyd.sd_copy(src, dst, chunk=32768)              # Copies a file using large SD transfers.
         cyd.wifi_connect(ssid, password)                # Connects to a WLAN network.
         cyd.wifi_isconnected()                          # Checks to see that the wifi connection is connected.
         cyd.wifi_ip()                                   # Get the CYD's IPv4 address on your WLAN.
         cyd.wifi_create_ap(_ssid)                       # Creates an Access Point (AP) WLAN network.
         cyd.shutdown()                                  # Safely shutdown CYD device.
     '''
-    def __init__(self, rgb_pmw=False, speaker_gain=512, display_width=240, display_height=320, wifi_ssid = None, wifi_password = None):
+    def __init__(self, rgb_pmw=False, speaker_gain=512, display_width=240, display_height=320, wifi_ssid = None, wifi_password = None, hard_irq = False, hw_touch_spi = False, spi_hz = 40_000_000, speaker_dac = False, sd_enabled = False, sd_freq = None, sd_detect = False, tone_timer = 3):
         '''
         Initialize CDYc
 
@@ -155,24 +256,77 @@ class CYD(object):
             speaker_gain (Default = 512): Sets speaker's volume. The full gain range is 0 - 1023.
             display_width (Default = 240): Reset if needed.
             display_height (Default = 320): Reset if needed.
+            hard_irq (Default = False): Uses a hard interrupt on the touch IRQ pin, if true.
+                                        The touch is then read outside the interrupt via micropython.schedule().
+            hw_touch_spi (Default = False): Reads the touchscreen with hardware SPI (VSPI) at 2 MHz instead of SoftSPI, if true.
+                                            Warning: The SD card also needs VSPI, so mount_sd() is unavailable in this mode.
+            spi_hz (Default = 40_000_000): Display SPI clock. 80_000_000 roughly halves transfer time on panels that
+                                           support it; go back to 40_000_000 if the display shows snow.
+                                           (The ESP32 clamps out-of-range rates without raising an error.)
+            speaker_dac (Default = False): Drives the speaker with the DAC on pin 26 (sine wave), if true.
+                                           Sets the speaker to PWM (square wave), if false.
+                                           Warning: DAC tones always block until they finish.
+            sd_enabled (Default = False): Initializes the SD card right away, if true, so mount_sd() only has to mount it.
+                                          Initializes the SD card on the first mount_sd() call, if false.
+            sd_freq (Default = None): SD card SPI clock. None uses 40_000_000 with sd_enabled = True and
+                                      SDCard's 20_000_000 default otherwise. Reduce to 20_000_000 for cards that fail to mount.
+            sd_detect (Default = False): Checks the DAT3/CS line for a card before the slow SDCard() probe, if true.
+                                         Warning: Some cards' pull-ups are too weak to read high, so they are skipped.
+            tone_timer (Default = 3): Hardware timer id used to stop play_tone() in PWM mode.
+                                      Don't use this timer elsewhere; pick another id (0 - 3) if you need timer 3.
         '''
         # Display
-        hspi = SPI(1, baudrate=40000000, sck=Pin(14), mosi=Pin(13))
+        hspi = SPI(1, baudrate=spi_hz, sck=Pin(14), mosi=Pin(13))    # HSPI IO-MUX pins
         self.display = Display(hspi, dc=Pin(2), cs=Pin(15), rst=Pin(0), width=display_width, height=display_height)
+        self.W = self.display.width                 # Cached display width and height
+        self.H = self.display.height
+        self._w_minus_1 = self.W - 1                # Cached for the touch handler and shutdown
+        self._h_minus_1 = self.H - 1
+        self.fb = None                              # Back-buffer, created by fb_init()
+        self.fb_buf = None
+        self._fb_y = 0
+        self._fb_h = 0
+        self._border_rect = (2, 2, self._w_minus_1 - 4, self._h_minus_1 - 4)      # Shutdown screen layout
+        self._shutdown_xy = (self.W // 2 - 52, self.H // 2 - 4)
         self._x = 0
         self._y = 0
+        self._touch_flag = False
+        self._touch_buf = [0, 0]                    # Shared list returned by touches()
+        self._touch_event = None                    # asyncio.ThreadSafeFlag, created by wait_touch()
+        self._last_irq_ms = 0                       # Hard touch interrupt debounce
 
         # Backlight
-        self.tft_bl = Pin(21, Pin.OUT)
-        self.tft_bl.value(1) #Turn on backlight
+        self.tft_bl = PWM(Pin(21), freq=5000, duty=1023)     # Turn on backlight (PWM so shutdown() can fade it)
 
         # Touch
-        self.last_tap = (-1,-1)
-        sspi = SoftSPI(baudrate=500000, sck=Pin(25), mosi=Pin(32), miso=Pin(39))
-        self._touch = Touch(sspi, cs=Pin(33), int_pin=Pin(36), int_handler=self._touch_handler)
+        self._last_tap_x = -1
+        self._last_tap_y = -1
+        self._err_margin = 10
+        self._err2 = 100                            # error_margin squared
+        # The XPT2046 accepts up to 2.5 MHz; its ADC needs DCLK above ~200 kHz to hold a conversion, so don't go lower.
+        self._hw_touch_spi = hw_touch_spi
+        if self._hw_touch_spi == False:
+            sspi = SoftSPI(baudrate=2500000, sck=Pin(25), mosi=Pin(32), miso=Pin(39))
+        else:
+            sspi = SPI(2, baudrate=2_000_000, polarity=0, phase=0, sck=Pin(25), mosi=Pin(32), miso=Pin(39))
+        self._hard_irq = hard_irq
+        self._touch_asleep = False
+        self._touch_irq_pin = Pin(36, Pin.IN)
+        if self._hard_irq == False:
+            self._touch = Touch(sspi, cs=Pin(33), int_pin=self._touch_irq_pin, int_handler=self._touch_handler)
+        else:
+            self._touch = Touch(sspi, cs=Pin(33))
+            self._sched_ref = self._deferred_touch      # Bound once so the ISR does not allocate
+            self._sched_pending = False                 # True while a _deferred_touch() is queued
+            self._touch_irq_pin.irq(handler=self._hard_isr, trigger=Pin.IRQ_FALLING, hard=True)
+        # X, Y and Z1 commands sent in a single transfer
+        self._touch_tx = bytearray(b'\xD0\x00\x00\x90\x00\x00\xB0\x00\x00')
+        self._touch_rx = bytearray(9)
+        self._touch.raw_touch = self._raw_touch
 
         # Boot Button
         self._button_boot = Pin(0, Pin.IN)
+        self.button_boot = self._button_boot.value      # cyd.button_boot() gets the Boot button's current state
 
         # LDR: Light Sensor (Measures Darkness)
         self._ldr = ADC(34)
@@ -184,20 +338,48 @@ class CYD(object):
             self.RGBg = Pin(16, Pin.OUT, value=1)    # Green
             self.RGBb = Pin(17, Pin.OUT, value=1)    # Blue
         else:
-            self.RGBr = PWM(Pin(4), freq=200, duty=1023)     # Red
-            self.RGBg = PWM(Pin(16), freq=200, duty=1023)    # Green
-            self.RGBb = PWM(Pin(17), freq=200, duty=1023)    # Blue
+            # The LED is common-anode (active low), so duty 1023 is off.
+            # All three channels use the same frequency so the ESP32 LEDC driver shares one timer between them.
+            self.RGBr = PWM(Pin(4), freq=5000, duty=1023)     # Red
+            self.RGBg = PWM(Pin(16), freq=5000, duty=1023)    # Green
+            self.RGBb = PWM(Pin(17), freq=5000, duty=1023)    # Blue
+            # Precomputed 0-255 brightness to inverted 10-bit duty table
+            self._duty_lut = array('H', (1023 - (v * 1023) // 255 for v in range(256)))
+            # Direct LEDC register writes for rgb_fast()
+            self._ledc_regs = self._ledc_duty_regs()
+            if self._ledc_regs is not None:
+                self.rgb_fast = self._rgb_ledc
             print("RGB PMW Ready")
 
         # Speaker
-        self._speaker_pin = Pin(26, Pin.OUT)
-        self.speaker_gain = int(min(max(speaker_gain, 0),1023))     # Min 0, Max 1023
-        self.speaker_pwm = PWM(self._speaker_pin, freq=440, duty=0)
+        self.speaker_gain = _clamp10(int(speaker_gain))     # Min 0, Max 1023
+        self._speaker_dac = speaker_dac
+        if self._speaker_dac == False:
+            self._speaker_pin = Pin(26, Pin.OUT)
+            self.speaker_pwm = PWM(self._speaker_pin, freq=440, duty=0)
+        else:
+            from machine import DAC
+            from math import sin, pi
+            self._dac = DAC(Pin(26))
+            self._dac.write(0)
+            # One period of a sine wave centered on 128, shared by every tone
+            self._sine = array('B', (128 + int(127 * sin(2 * pi * i / 256)) for i in range(256)))
+        self._tone_timer = Timer(tone_timer)
+        self._tone_off_cb = self._tone_off       # Bound once so the timer callback does not allocate
 
         # SD Card
         # The user needs to run mount_sd() to access SD card.
         self._sd_ready = False
         self._sd_mounted = False
+        if sd_freq is None:
+            sd_freq = 40_000_000 if sd_enabled == True else 20_000_000
+        self._sd_freq = sd_freq
+        self._sd_detect = sd_detect
+        if sd_enabled == True:
+            try:
+                self._sd_init()         # Set up the card now so mount_sd() only has to mount it
+            except:
+                print("Failed to initialize SD card")
         
         # WIFI
         if wifi_ssid is not None:
@@ -206,57 +388,362 @@ class CYD(object):
         
         print("CYD ready...")
         
+    ######################################################
+    #   Display
+    ######################################################
+    @property
+    def display_spi(self):
+        '''
+        The display's SPI bus.
+        Every transfer has a fixed setup cost, so batch pixel data into chunks of at least MIN_SPI_CHUNK bytes.
+        '''
+        return self.display.spi
+
+    def blit(self, x, y, w, h, buf):
+        '''
+        Writes a buffer of RGB565 pixel data to a region of the display in a single SPI transfer.
+
+        Args:
+            x, y: Top left corner of the region.
+            w, h: Width and height of the region.
+            buf: RGB565 (big-endian) pixel data, w * h * 2 bytes long.
+                 Buffers smaller than MIN_SPI_CHUNK bytes waste most of the transfer on setup.
+        '''
+        self.display.block(x, y, x + w - 1, y + h - 1, buf)
+
+    def fill_rect_raw(self, x, y, w, h, color_bytes):
+        '''
+        Draws a filled rectangle from a pre-packed color, like display.fill_rectangle().
+        Skips the driver's single per-call color.to_bytes() and its horizontal/vertical split.
+        The rectangle is sent in chunks of about 1024 pixels to limit memory use.
+        Rectangles that run off the display are not drawn.
+
+        Args:
+            x, y: Top left corner of the rectangle.
+            w, h: Width and height of the rectangle.
+            color_bytes: Big-endian RGB565 color, e.g. cyd.BLUE_B.
+        '''
+        if w <= 0 or h <= 0:
+            return
+        x1 = x + w - 1
+        if self.display.is_off_grid(x, y, x1, y + h - 1):
+            return
+        rows = min(h, max(1, 1024 // w))
+        buf = color_bytes * (rows * w)
+        end = y + h
+        while y < end:
+            n = min(rows, end - y)
+            if n == rows:
+                self.display.block(x, y, x1, y + n - 1, buf)
+            else:
+                self.display.block(x, y, x1, y + n - 1, memoryview(buf)[:n * w * 2])
+            y += n
+
+    ######################################################
+    #   Frame Buffer
+    ######################################################
+    def fb_init(self, y=0, h=40):
+        '''
+        Creates an RGB565 back-buffer covering a full-width band of the display.
+        Draw into it with the fb_* functions, then push the whole band with flush() in one SPI transfer.
+        A full 240x320 buffer needs 150 KB, which is more RAM than the CYD has free, so use a band.
+
+        Args:
+            y (Default = 0): First display row covered by the buffer.
+            h (Default = 40): Number of rows covered by the buffer.
+        '''
+        if self.fb is None or self._fb_h != h:
+            self.fb = None                          # Release any old buffer before allocating the new one
+            self.fb_buf = None
+            self.fb_buf = bytearray(self.W * h * 2)
+            self.fb = FrameBuffer(self.fb_buf, self.W, h, RGB565)
+        self._fb_y = y
+        self._fb_h = h
+
+    def flush(self, y0=None, y1=None):
+        '''
+        Pushes the back-buffer (or rows y0 to y1 of it, in display coordinates) to the display.
+        '''
+        fb_y = self._fb_y
+        if y0 is None:
+            y0 = fb_y
+        if y1 is None:
+            y1 = fb_y + self._fb_h - 1
+        row = self.W * 2
+        self.display.block(0, y0, self._w_minus_1, y1,
+                           memoryview(self.fb_buf)[(y0 - fb_y) * row:(y1 - fb_y + 1) * row])
+
+    def fb_fill(self, color):
+        '''
+        Fills the back-buffer with an RGB565 color.
+        '''
+        self.fb.fill(_swap16(color))
+
+    def fb_pixel(self, x, y, color):
+        '''
+        Draws a pixel into the back-buffer. (display coordinates)
+        '''
+        self.fb.pixel(x, y - self._fb_y, _swap16(color))
+
+    def fb_hline(self, x, y, w, color):
+        '''
+        Draws a horizontal line into the back-buffer. (display coordinates)
+        '''
+        self.fb.hline(x, y - self._fb_y, w, _swap16(color))
+
+    def fb_vline(self, x, y, h, color):
+        '''
+        Draws a vertical line into the back-buffer. (display coordinates)
+        '''
+        self.fb.vline(x, y - self._fb_y, h, _swap16(color))
+
+    def fb_line(self, x1, y1, x2, y2, color):
+        '''
+        Draws a line into the back-buffer. (display coordinates)
+        '''
+        fb_y = self._fb_y
+        self.fb.line(x1, y1 - fb_y, x2, y2 - fb_y, _swap16(color))
+
+    def fb_rect(self, x, y, w, h, color):
+        '''
+        Draws a rectangle outline into the back-buffer. (display coordinates)
+        '''
+        self.fb.rect(x, y - self._fb_y, w, h, _swap16(color))
+
+    def fb_fill_rect(self, x, y, w, h, color):
+        '''
+        Draws a filled rectangle into the back-buffer. (display coordinates)
+        '''
+        self.fb.fill_rect(x, y - self._fb_y, w, h, _swap16(color))
+
+    def fb_text(self, text, x, y, color):
+        '''
+        Draws 8x8 text into the back-buffer. (display coordinates)
+        '''
+        self.fb.text(text, x, y - self._fb_y, _swap16(color))
+
     ######################################################
     #   Touchscreen Press Event
     ######################################################
-    def _touch_handler(self, x, y):
+    @micropython.viper
+    def _touch_handler(self, x: int, y: int):
         '''
         Interrupt Handler
         This function is called each time the screen is touched.
+        Only stores the coordinates and raises a flag; printing or any other
+        user logic belongs in the main loop (see poll_touch()).
         '''
         # X needs to be flipped
-        x = (self.display.width - 1) - x
-
-        self._x = x
+        self._x = int(self._w_minus_1) - x
         self._y = y
+        self._touch_flag = True
+        ev = self._touch_event
+        if ev:                                      # Viper can't compare objects with None
+            ev.set()                                # Wake wait_touch()
+
+    touchscreen_press = _touch_handler      # v1.0 name, kept for older scripts
+
+    def _hard_isr(self, pin):
+        '''
+        Hard Interrupt Handler (hard_irq = True)
+        Only schedules _deferred_touch(); SPI reads are not allowed in a hard interrupt.
+        A bouncing pen fires many edges, so only one read is queued at a time and
+        edges within 20 ms of the last queued read are ignored (see touch_raw()).
+        The default (soft) path needs no debounce here; the xpt2046 driver locks for 100 ms per touch.
+        '''
+        if self._sched_pending:
+            return
+        now = time.ticks_ms()
+        if time.ticks_diff(now, self._last_irq_ms) < 20:
+            return
+        self._last_irq_ms = now
+        self._sched_pending = True
+        try:
+            micropython.schedule(self._sched_ref, 0)
+        except RuntimeError:                        # Schedule queue full
+            self._sched_pending = False
+
+    def _deferred_touch(self, _):
+        '''
+        Reads and stores the touch scheduled by _hard_isr(). (INTERNAL USE ONLY)
+        '''
+        self._sched_pending = False
+        buff = self._touch.raw_touch()
+        if buff is not None:
+            x, y = self._touch.normalize(*buff)
+            self._touch_handler(x, y)
+
+    def poll_touch(self, callback=None):
+        '''
+        Checks for a touch stored by the interrupt handler.
+        Call this from your main loop instead of doing work inside the interrupt.
+
+        Args:
+            callback (Default = None): Function called as callback(x, y) when a new touch is available.
+
+        Return:
+            (x, y) of the new touch, or None if the screen has not been touched since the last check.
+        '''
+        if not self._touch_flag:
+            return None
+        x, y = self.touches()
+        if callback is not None:
+            callback(x, y)
+        return x, y
+
+    def _read_touch_raw(self):
+        '''
+        Reads the raw 12-bit X, Y and Z1 samples in one SPI transfer. (INTERNAL USE ONLY)
+        '''
+        rx = self._touch_rx
+        self._touch.cs(0)
+        self._touch.spi.write_readinto(self._touch_tx, rx)
+        self._touch.cs(1)
+        return ((rx[1] << 4) | (rx[2] >> 4),
+                (rx[4] << 4) | (rx[5] >> 4),
+                (rx[7] << 4) | (rx[8] >> 4))
+
+    def _raw_touch(self):
+        '''
+        Replacement for the xpt2046 driver's raw_touch() using the batched read. (INTERNAL USE ONLY)
+        '''
+        x, y, _ = self._read_touch_raw()
+        t = self._touch
+        if t.x_min <= x <= t.x_max and t.y_min <= y <= t.y_max:
+            return (x, y)
+        return None
+
+    def _touch_sleep(self):
+        '''
+        Stops the touch interrupt and powers down the XPT2046. (INTERNAL USE ONLY)
+        '''
+        if self._touch_asleep:
+            return
+        self._touch_irq_pin.irq(handler=None)
+        self._touch.cs(0)
+        self._touch.spi.write(b'\x80')     # PD1 = PD0 = 0: power down between conversions
+        self._touch.cs(1)
+        self._touch_asleep = True
 
-        #print("Touch:", x, y)
+    def _touch_wake(self):
+        '''
+        Wakes the XPT2046 with a dummy read and restores the touch interrupt. (INTERNAL USE ONLY)
+        '''
+        if not self._touch_asleep:
+            return
+        self._read_touch_raw()
+        if self._hard_irq == False:
+            self._touch_irq_pin.irq(trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING, handler=self._touch.int_press)
+        else:
+            self._touch_irq_pin.irq(handler=self._hard_isr, trigger=Pin.IRQ_FALLING, hard=True)
+        self._touch_asleep = False
 
     def touches(self):
         '''
         Returns last stored touch data.
+        Warning: Returns the same shared [x, y] list on every call, so unpack it rather than storing it.
 
         Return:
             x: x coordinate of finger 1
             y: y coordinate of finger 1
         '''
+        buf = self._touch_buf
+        buf[0] = self._x
+        buf[1] = self._y
+
+        self._x = 0
+        self._y = 0
+        self._touch_flag = False
+
+        return buf
+
+    async def wait_touch(self):
+        '''
+        Waits (asyncio) until the screen is touched, without polling.
+
+        Return:
+            x: x coordinate of finger 1
+            y: y coordinate of finger 1
+        '''
+        if self._touch_event is None:
+            import asyncio
+            self._touch_event = asyncio.ThreadSafeFlag()
+        await self._touch_event.wait()
+        return self.touches()
+
+    def touch_raw(self):
+        '''
+        Reads the touchscreen right now, bypassing the interrupt and its debounce.
+
+        Return:
+            (x, y) of the current touch, or None if the screen is not being touched.
+        '''
+        buff = self._touch.raw_touch()
+        if buff is None:
+            return None
+        x, y = self._touch.normalize(*buff)
+        return self._w_minus_1 - x, y
+
+    def touch_x(self):
+        '''
+        Returns and clears the last stored touch x coordinate, without allocating.
+        '''
         x = self._x
+        self._x = 0
+        self._touch_flag = False
+        return x
+
+    def touch_y(self):
+        '''
+        Returns and clears the last stored touch y coordinate, without allocating.
+        '''
         y = self._y
+        self._y = 0
+        self._touch_flag = False
+        return y
+
+    def touch_into(self, buf):
+        '''
+        Writes the last stored touch data into a caller-provided buffer, e.g. array('h', [0, 0]).
+
+        Return: buf, holding [x, y]
+        '''
+        buf[0] = self._x
+        buf[1] = self._y
 
         self._x = 0
         self._y = 0
+        self._touch_flag = False
 
-        return x, y
+        return buf
 
+    @micropython.native
     def double_tap(self, x, y, error_margin = 10):
         '''
         Returns whether or not a double tap was detected.
+        A double tap is a tap within error_margin pixels (straight-line distance) of the previous one.
 
         Return:
             True: Double-tap detected.
             False: Single tap detected.
         '''
-        # Double tap to exit
-        if self.last_tap[0] - error_margin <= x and self.last_tap[0] + error_margin >= x:
-            if self.last_tap[1] - error_margin <= y and self.last_tap[1] + error_margin >= y:
-                self.last_tap = (-1,-1)
-                return True
-        self.last_tap = (x,y)
+        if error_margin != self._err_margin:
+            self._err_margin = error_margin
+            self._err2 = error_margin * error_margin
+        dx = x - self._last_tap_x
+        dy = y - self._last_tap_y
+        if dx * dx + dy * dy <= self._err2:
+            self._last_tap_x = -1
+            self._last_tap_y = -1
+            return True
+        self._last_tap_x = x
+        self._last_tap_y = y
         return False
 
     ######################################################
     #   RGB LED
     ######################################################
+    @micropython.native
     def rgb(self, color):
         '''
         Set RGB LED color.
@@ -271,17 +758,70 @@ class CYD(object):
                         r (0-255): Red brightness.
                         g (0-255): Green brightness.
                         b (0-255): Blue brightness.
+                        Values are clamped to 0 - 255 and index a precomputed duty table.
         '''
         r, g, b = color
         if self._rgb_pmw == False:
-            self.RGBr.value(1 if min(max(r, 0),1) == 0 else 0)
-            self.RGBg.value(1 if min(max(g, 0),1) == 0 else 0)
-            self.RGBb.value(1 if min(max(b, 0),1) == 0 else 0)
+            self.RGBr.value(0 if r else 1)
+            self.RGBg.value(0 if g else 1)
+            self.RGBb.value(0 if b else 1)
         else:
-            self.RGBr.duty(int(min(max(self._remap(r,0,255,1023,0), 0),1023)))
-            self.RGBg.duty(int(min(max(self._remap(g,0,255,1023,0), 0),1023)))
-            self.RGBb.duty(int(min(max(self._remap(b,0,255,1023,0), 0),1023)))
+            lut = self._duty_lut
+            self.RGBr.duty(lut[_clamp8(int(r))])
+            self.RGBg.duty(lut[_clamp8(int(g))])
+            self.RGBb.duty(lut[_clamp8(int(b))])
+
+    def rgb_fast(self, r, g, b):
+        '''
+        Set RGB LED color with three int values, for animation loops.
+        In dynamic mode the LEDC duty registers are written directly, skipping PWM.duty().
+        Falls back to rgb() in static mode or if the LED's LEDC channels could not be found.
 
+        Args:
+            r (0-255): Red brightness.
+            g (0-255): Green brightness.
+            b (0-255): Blue brightness.
+        '''
+        self.rgb((r, g, b))
+
+    @micropython.viper
+    def _rgb_ledc(self, r: int, g: int, b: int):
+        '''
+        Writes the RGB LED duty registers and starts the duty update. (INTERNAL USE ONLY)
+        '''
+        regs = ptr32(self._ledc_regs)
+        lut = ptr16(self._duty_lut)
+        shift = int(self._ledc_shift)
+        start = regs[6]                         # CONF1 start word, built in Python by _ledc_duty_regs()
+        ptr32(regs[0])[0] = lut[r & 0xFF] << shift
+        ptr32(regs[1])[0] = start
+        ptr32(regs[2])[0] = lut[g & 0xFF] << shift
+        ptr32(regs[3])[0] = start
+        ptr32(regs[4])[0] = lut[b & 0xFF] << shift
+        ptr32(regs[5])[0] = start
+
+    def _ledc_duty_regs(self):
+        '''
+        Finds the LEDC DUTY and CONF1 register addresses of the red, green and blue channels. (INTERNAL USE ONLY)
+
+        Return: array of the six addresses followed by the CONF1 start word,
+                or None if a channel is not high-speed or has under 10 bits of resolution.
+        '''
+        regs = array('I', (0, 0, 0, 0, 0, 0, _LEDC_CONF1_START))
+        for i, gpio in enumerate((4, 16, 17)):
+            ch = _ledc_hs_channel(gpio)
+            if ch < 0:
+                return None
+            conf0 = _LEDC_BASE + ch * 0x14
+            res = mem32[_LEDC_HSTIMER0_CONF + 8 * (mem32[conf0] & 0x3)] & 0x1F
+            if res < 10:
+                return None
+            regs[2 * i] = conf0 + 0x8         # LEDC_HSCHn_DUTY_REG
+            regs[2 * i + 1] = conf0 + 0xC     # LEDC_HSCHn_CONF1_REG
+            self._ledc_shift = res - 10 + 4   # Scale 10-bit duty to the timer resolution (4 fractional bits)
+        return regs
+
+    @micropython.native
     def _remap(self, value, in_min, in_max, out_min, out_max):
         '''
         Internal function for remapping values from one scale to a second.
@@ -294,34 +834,48 @@ class CYD(object):
     ######################################################
     #   Light Sensor
     ######################################################
+    @micropython.native
     def light(self):
         '''
         Light Sensor (Measures darkness)
 
         Return: a value from 0.0 to 1.0
         '''
-        return self._ldr.read_u16()/65535
+        return self._ldr.read_u16() * _LDR_SCALE
 
-    ######################################################
-    #   Button
-    ######################################################
-    def button_boot(self):
+    def light_raw(self):
         '''
-        Gets the Boot button's current state
+        Light Sensor (Measures darkness) as the raw ADC reading. Preferred for high-rate polling.
+
+        Return: a value from 0 to 65535
+        '''
+        return self._ldr.read_u16()
+
+    def light8(self):
         '''
-        return self._button_boot.value
+        Light Sensor (Measures darkness) without float math
+
+        Return: a value from 0 to 255
+        '''
+        return self._ldr.read_u16() >> 8
 
     ######################################################
     #   Backlight
     ######################################################
+    @micropython.native
     def backlight(self, val):
         '''
         Sets TFT Backlight Off/On
 
         Arg:
             val: 0 or 1 (0 = off/ 1 = on)
+                 The touchscreen is put to sleep while the backlight is off.
         '''
-        self.tft_bl.value(min(max(val, 0),1))
+        self.tft_bl.duty(1023 if val else 0)
+        if val:
+            self._touch_wake()
+        else:
+            self._touch_sleep()
 
     ######################################################
     #   Speaker
@@ -329,19 +883,96 @@ class CYD(object):
     def play_tone(self, freq, duration, gain=0):
         '''
         Plays a tone (Optional speaker must be attached!)
+        PWM speaker: returns immediately; a one-shot timer turns the speaker off after duration.
+        DAC speaker (speaker_dac = True): blocks until the tone has finished, like play_tone_blocking().
+                                          A freq of 0 is a silent rest.
 
         Args:
             freq: Frequency of the tone.
-            duration: How long does the tone play for.
-            gain: volume
+            duration: How long does the tone play for. (in milliseconds)
+            gain: volume (0 - 1023, 0 = use speaker_gain)
         '''
+        if gain == 0:
+            gain = self.speaker_gain
+        else:
+            gain = _clamp10(int(gain))          # Min 0, Max 1023
+        if self._speaker_dac == True:
+            self._dac_play(freq, duration, gain)
+            return
         self.speaker_pwm.freq(freq)
+        self.speaker_pwm.duty(gain)             # Turn on speaker by resetting speaker gain
+        self._tone_timer.init(mode=Timer.ONE_SHOT, period=duration, callback=self._tone_off_cb)
+
+    def play_tone_blocking(self, freq, duration, gain=0):
+        '''
+        Plays a tone and waits until it has finished. (Optional speaker must be attached!)
+
+        Args:
+            freq: Frequency of the tone. (DAC speaker: 0 is a silent rest)
+            duration: How long does the tone play for. (in milliseconds)
+            gain: volume (0 - 1023, 0 = use speaker_gain)
+        '''
         if gain == 0:
             gain = self.speaker_gain
+        else:
+            gain = _clamp10(int(gain))          # Min 0, Max 1023
+        if self._speaker_dac == True:
+            self._dac_play(freq, duration, gain)
+            return
+        self._tone_timer.deinit()               # Cancel a pending play_tone() stop so it can't cut this tone short
+        self.speaker_pwm.freq(freq)
         self.speaker_pwm.duty(gain)             # Turn on speaker by resetting speaker gain
         time.sleep_ms(duration)
         self.speaker_pwm.duty(0)                # Turn off speaker by resetting gain to zero
 
+    def _dac_play(self, freq, duration, gain):
+        '''
+        Checks freq before handing the tone to _dac_tone(), whose native divisions have no zero check. (INTERNAL USE ONLY)
+        A freq of 0 is a rest: the speaker stays silent for duration.
+        '''
+        if freq == 0:
+            time.sleep_ms(duration)
+            return
+        if freq < 0 or freq > 1_000_000:
+            raise ValueError("freq must be 0 - 1000000 Hz in DAC mode")
+        self._dac_tone(freq, duration, gain)
+
+    @micropython.viper
+    def _dac_tone(self, freq: int, duration: int, gain: int):
+        '''
+        Plays a sine tone on the DAC, picking each sample from the elapsed time. (INTERNAL USE ONLY)
+        The output ramps from idle (0) up to the sine's midpoint first and back down afterwards,
+        since jumping straight to or from the midpoint makes the speaker click.
+        '''
+        sine = ptr8(self._sine)
+        write = self._dac.write
+        sleep_us = time.sleep_us
+        ticks_us = time.ticks_us
+        for v in range(128):                        # Ramp up to midpoint (~3 ms)
+            write(v)
+            sleep_us(20)
+        period = 1000000 // freq
+        end = duration * 1000
+        last = 128
+        start = int(ticks_us())
+        while True:
+            elapsed = (int(ticks_us()) - start) & 0x3FFFFFFF     # ticks_us() wraps at 2**30
+            if elapsed >= end:
+                break
+            s = int(sine[(elapsed % period) * 256 // period])
+            last = 128 + (((s - 128) * gain) >> 10)
+            write(last)
+        while last > 0:                             # Ramp down to idle from wherever the tone stopped
+            last -= 1
+            write(last)
+            sleep_us(20)
+
+    def _tone_off(self, t):
+        '''
+        Timer callback that turns off the speaker. (INTERNAL USE ONLY)
+        '''
+        self.speaker_pwm.duty(0)                # Turn off speaker by resetting gain to zero
+
     ######################################################
     #   SD Card
     ######################################################
@@ -349,10 +980,10 @@ class CYD(object):
         '''
         Mounts SD Card
         '''
+        import os                       # Imported on first use to keep boot fast
         try:
             if self._sd_ready == False:
-                self.sd = SDCard(slot=2)
-                self._sd_ready = True
+                self._sd_init()
             if self._sd_ready == True:
                 os.mount(self.sd, '/sd')  # mount
                 self._sd_mounted = True
@@ -361,10 +992,39 @@ class CYD(object):
         except:
             print("Failed to mount SD card")
 
+    def _sd_init(self):
+        '''
+        Creates the SDCard object (once). (INTERNAL USE ONLY)
+        '''
+        if self._hw_touch_spi == True:
+            print("SD card unavailable: VSPI is used by the touchscreen (hw_touch_spi=True)")
+            return
+        if self._sd_detect == True and not self._sd_present():
+            print("No SD card detected, skipping init")
+            return
+        from machine import SDCard
+        self.sd = SDCard(slot=2, freq=self._sd_freq)
+        self._sd_ready = True
+
+    def _sd_present(self):
+        '''
+        Quick card detect before the slow SDCard() probe, used when sd_detect = True. (INTERNAL USE ONLY)
+        An SD card has a pull-up on DAT3/CS (GPIO5) that fights the ESP32's weak pull-down,
+        so the line reads high when a card is inserted. Weak card pull-ups (up to 90 kOhm)
+        can leave the line below the logic-high threshold, which is why this check is opt-in.
+        '''
+        probe = Pin(5, Pin.IN, Pin.PULL_DOWN)
+        time.sleep_us(100)
+        present = probe.value() == 1
+        probe.init(Pin.IN, pull=None)           # Leave the pin floating again for SDCard()
+        del probe
+        return present
+
     def unmount_sd(self):
         '''
         Unmounts SD Card
         '''
+        import os
         try:
             if self._sd_mounted == True:
                 os.unmount('/sd')  # mount
@@ -373,6 +1033,51 @@ class CYD(object):
         except:
             print("Failed to unmount SD card")
     
+    def release_sd(self):
+        '''
+        Deinitializes the SD card's SPI bus (VSPI) and its DMA channel. mount_sd() sets it up again.
+        '''
+        if self._sd_mounted == True:
+            self.unmount_sd()
+        if self._sd_ready == True:
+            self.sd.deinit()
+            self.sd = None
+            self._sd_ready = False
+
+    def sd_session(self):
+        '''
+        Mounts the SD card for the length of a with block, then unmounts it and releases its SPI bus:
+            with cyd.sd_session():
+                cyd.sd_copy('/sd/a.bin', '/sd/b.bin')
+        The display and SD card have separate SPI buses and pins on the CYD, so they can't share one controller;
+        releasing VSPI between sessions frees its DMA channel instead.
+        '''
+        return _SDSession(self)
+
+    def sd_copy(self, src, dst, chunk=32768):
+        '''
+        Copies a file in large chunks so the SD card can use multi-block transfers.
+        Avoid small (e.g. 512 byte) read/write loops; each transfer pays the card's access time.
+
+        Args:
+            src: Path of the file to copy, e.g. '/sd/data.bin'.
+            dst: Path of the new file.
+            chunk (Default = 32768): Bytes per read/write. 65536 may be faster but needs more free RAM.
+
+        Return: Number of bytes copied.
+        '''
+        buf = bytearray(chunk)
+        mv = memoryview(buf)
+        total = 0
+        with open(src, 'rb') as f, open(dst, 'wb') as g:
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                g.write(mv[:n])
+                total += n
+        return total
+
     ######################################################
     #   Wifi
     ######################################################
@@ -431,22 +1136,48 @@ class CYD(object):
     ######################################################
     #   Shutdown
     ######################################################
+    def _draw_shutdown_screen(self):
+        '''
+        Renders the shutdown screen into the back-buffer one band at a time, one SPI transfer per band. (INTERNAL USE ONLY)
+        Draws it directly instead if there isn't enough free RAM for the band, so shutdown() can't fail here.
+        '''
+        h = self._fb_h if self._fb_h else 40        # Reuse an existing back-buffer
+        try:
+            self.fb_init(0, h)
+        except MemoryError:
+            self.fill_rect_raw(0, 0, self.W, self.H, self.BLACK_B)
+            self.display.draw_rectangle(*self._border_rect, self.RED)
+            self.display.draw_text8x8(*self._shutdown_xy, "Shutting Down", self.WHITE, background=self.BLACK)
+            return
+        for y in range(0, self.H, h):
+            self._fb_y = y
+            self.fb_fill(self.BLACK)
+            self.fb_rect(*self._border_rect, self.RED)
+            self.fb_text("Shutting Down", *self._shutdown_xy, self.WHITE)
+            self.flush(y, min(y + h, self.H) - 1)
+
     def shutdown(self):
         '''
         Resets CYD and properly shuts down.
         '''
-        self.display.fill_rectangle(0, 0, self.display.width-1, self.display.height-1, self.BLACK)
-        self.display.draw_rectangle(2, 2, self.display.width-5, self.display.height-5, self.RED)
-        self.display.draw_text8x8(self.display.width // 2 - 52, self.display.height // 2 - 4, "Shutting Down", self.WHITE, background=self.BLACK)
-        time.sleep(2.0)
+        self._draw_shutdown_screen()
+        for d in range(1023, -1, -43):          # Fade out the backlight over ~2 seconds
+            self.tft_bl.duty(d)
+            time.sleep_ms(83)
         self.unmount_sd()
-        self.speaker_pwm.deinit()
+        self._tone_timer.deinit()
+        if self._speaker_dac == False:
+            self.speaker_pwm.deinit()
+        else:
+            self._dac.write(0)
         if self._rgb_pmw == False:
             self.RGBr.value(1)
             self.RGBg.value(1)
             self.RGBb.value(1)
         else:
-            self.rgb(0,0,0)
-        self.tft_bl.value(0)
+            self.rgb((0, 0, 0))
+        self.tft_bl.duty(0)
+        self.tft_bl.deinit()
+        self._touch_sleep()
         self.display.cleanup()
         print("========== Goodbye ==========")
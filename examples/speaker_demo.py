@@ -10,7 +10,7 @@ from cydr import CYD
 
 cyd = CYD()
 
-cyd.display.fill_rectangle(0, 0, cyd.display.width-1, cyd.display.height-1, cyd.BLUE)
+cyd.fill_rect_raw(0, 0, cyd.W, cyd.H, cyd.BLUE_B)
 
 
 duration = 500    # How long to play each note. (in milliseconds)
@@ -18,14 +18,14 @@ pause = 2.0       # How long to pause in between each tone. (in seconds)
 
 # Play tone 1
 print("Playing Tone 1")
-cyd.display.draw_text8x8(cyd.display.width // 2 - 56, cyd.display.height // 2 - 4, "Playing Tone 1", cyd.WHITE, background=cyd.BLUE)
+cyd.display.draw_text8x8(cyd.W // 2 - 56, cyd.H // 2 - 4, "Playing Tone 1", cyd.WHITE, background=cyd.BLUE)
 
 cyd.play_tone(220, duration)  # A4 Tone
 time.sleep(pause)
 
 # Play tone 2
 print("Playing Tone 2")
-cyd.display.draw_text8x8(cyd.display.width // 2 - 56, cyd.display.height // 2 - 4, "Playing Tone 2", cyd.WHITE, background=cyd.BLUE)
+cyd.display.draw_text8x8(cyd.W // 2 - 56, cyd.H // 2 - 4, "Playing Tone 2", cyd.WHITE, background=cyd.BLUE)
 
 cyd.play_tone(440, duration)  # C5 Tone
 time.sleep(pause)
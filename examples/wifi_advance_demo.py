@@ -21,11 +21,16 @@ wifi = network.WLAN(network.STA_IF)
 wifi.active(True)
 
 text = "You are in:"
-cyd.display.draw_text8x8(cyd.display.width // 2 - int((len(text)*8)/2), cyd.display.height // 2 - 16, text, cyd.WHITE)
+cyd.display.draw_text8x8(cyd.W // 2 - int((len(text)*8)/2), cyd.H // 2 - 16, text, cyd.WHITE)
 
 url = "http://ip-api.com/json/"
 
-end_time = 0
+# Bind the tick functions once instead of looking them up on every loop.
+ticks_ms = time.ticks_ms
+ticks_diff = time.ticks_diff
+ticks_add = time.ticks_add
+
+end_time = ticks_ms()    # Fetch right away
 
 while not wifi.isconnected():
 
@@ -37,18 +42,18 @@ while not wifi.isconnected():
 while wifi.isconnected():
     x, y = cyd.touches()    # Get recent taps x, y
     
-    if time.ticks_ms() > end_time:
+    if ticks_diff(ticks_ms(), end_time) >= 0:    # ticks_diff() handles the tick counter wrapping around
         r = urequests.get(url).json()
         #print(r)    # Uncomment to print all data.
         text = str(r['city'])
         
         # draw text
-        cyd.display.draw_text8x8(cyd.display.width // 2 - int((len(text)*8)/2), cyd.display.height // 2 - 4, text, cyd.WHITE)
+        cyd.display.draw_text8x8(cyd.W // 2 - int((len(text)*8)/2), cyd.H // 2 - 4, text, cyd.WHITE)
         
         # reset end_time
         # We don't want to overburden the server and the CYD with requests so we request updates every 3 minutes.
         # This method also allows the other functions like the touch function to work in the background.
-        end_time = time.ticks_ms() + 180000   # 60000ms = 1 minute
+        end_time = ticks_add(ticks_ms(), 180000)   # 60000ms = 1 minute
     
     # Check that there ar new touch points (Default values are x = 0, y = 0)
     if x == 0 and y == 0:
@@ -18,22 +18,27 @@ url = "http://api.coindesk.com/v1/bpi/currentprice.json"
 #url = "http://api.open-notify.org/astros.json"
 #url = "http://ip-api.com/json/"
 
-end_time = 0
+# Bind the tick functions once instead of looking them up on every loop.
+ticks_ms = time.ticks_ms
+ticks_diff = time.ticks_diff
+ticks_add = time.ticks_add
+
+end_time = ticks_ms()    # Fetch right away
 
 while cyd.wifi_isconnected():
     x, y = cyd.touches()    # Get recent taps x, y
     
-    if time.ticks_ms() > end_time:
+    if ticks_diff(ticks_ms(), end_time) >= 0:    # ticks_diff() handles the tick counter wrapping around
         r = urequests.get(url).json()
         print(r['bpi']['USD']['rate_float'])
         text = "B" + str(r['bpi']['USD']['rate_float'])
         
         # draw text
-        cyd.display.draw_text8x8(cyd.display.width // 2 - 40, cyd.display.height // 2 - 4, text, cyd.WHITE, background=cyd.RED)
+        cyd.display.draw_text8x8(cyd.W // 2 - 40, cyd.H // 2 - 4, text, cyd.WHITE, background=cyd.RED)
         
         # reset end_time
         # We don't want to overburden the server and the CYD with requests so we request updates every 3 minutes.
-        end_time = time.ticks_ms() + 180000   # 60000ms = 1 minute
+        end_time = ticks_add(ticks_ms(), 180000)   # 60000ms = 1 minute
     
     # Check that there ar new touch points (Default values are x = 0, y = 0)
     if x == 0 and y == 0: